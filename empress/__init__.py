@@ -1,24 +1,64 @@
 """
 Wraps empress functionalities
 """
-import matplotlib
-# the tkagg backend is for pop-up windows, and will not work in environments
-# without graphics such as a remote server. Refer to issue #49
-try: 
-    matplotlib.use("tkagg")
-except ImportError:
-    print("Using Agg backend: will not be able to create pop-up windows.")
-    matplotlib.use("Agg")
-from matplotlib import pyplot as plt
-from typing import List, Iterable
+from __future__ import annotations
+
+import importlib
+from typing import List, Iterable, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
-from empress.xscape.CostVector import CostVector
-from empress import newickFormatReader
-from empress.newickFormatReader import ReconInput
-from empress.newickFormatReader import getInput as read_input
-from empress.xscape.reconcile import reconcile as xscape_reconcile
-from empress.xscape.plotcostsAnalytic import plot_costs_on_axis as xscape_plot_costs_on_axis
+if TYPE_CHECKING:
+    from matplotlib import pyplot as plt
+    from empress.newickFormatReader import ReconInput
+
+__all__ = ["Drawable", "ReconciliationWrapper", "ReconGraphWrapper", "CostRegionsWrapper",
+           "compute_cost_regions", "reconcile", "CostVector", "newickFormatReader", "ReconInput",
+           "read_input"]
+
+# The names below are imported on first access (PEP 562) so that importing empress
+# does not load matplotlib, Biopython and xscape up front. The xscape helpers used by
+# the wrappers are imported inside the functions that call them.
+# Each name maps to (module, attribute); an attribute of None means the module itself.
+_LAZY_ATTRIBUTES = {
+    "CostVector": ("empress.xscape.CostVector", "CostVector"),
+    "newickFormatReader": ("empress.newickFormatReader", None),
+    "ReconInput": ("empress.newickFormatReader", "ReconInput"),
+    "read_input": ("empress.newickFormatReader", "getInput"),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    module_name, attribute_name = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name)
+    if attribute_name is not None:
+        value = getattr(value, attribute_name)
+    # cache the value so later accesses do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+_backend_selected = False
+
+
+def _ensure_backend():
+    """
+    Select the matplotlib backend the first time something is drawn, so that
+    importing empress does not load Tk.
+    """
+    global _backend_selected
+    if _backend_selected:
+        return
+    _backend_selected = True
+    # the tkagg backend is for pop-up windows, and will not work in environments
+    # without graphics such as a remote server. Refer to issue #49
+    import matplotlib
+    try:
+        matplotlib.use("tkagg")
+    except ImportError:
+        print("Using Agg backend: will not be able to create pop-up windows.")
+        matplotlib.use("Agg")
 
 
 class Drawable(ABC):
@@ -37,6 +77,8 @@ class Drawable(ABC):
         """
         Draw self as matplotlib Figure.
         """
+        _ensure_backend()
+        from matplotlib import pyplot as plt
         figure, ax = plt.subplots(1, 1)
         self.draw_on(ax)
         return figure
@@ -93,6 +135,7 @@ class CostRegionsWrapper(Drawable):
         self._dup_max = dup_max
 
     def draw_on(self, axes: plt.Axes, log=False):
+        from empress.xscape.plotcostsAnalytic import plot_costs_on_axis as xscape_plot_costs_on_axis
         xscape_plot_costs_on_axis(axes, self._cost_vectors, self._transfer_min, self._transfer_max,
                                   self._dup_min, self._dup_max, log=False)
 
@@ -103,6 +146,7 @@ def compute_cost_regions(recon_input: ReconInput, transfer_min: float, transfer_
     Compute the cost polygon of recon_input. The cost polygon can be used
     to create a figure that separate costs into different regions.
     """
+    from empress.xscape.reconcile import reconcile as xscape_reconcile
     parasite_tree = recon_input.parasite_tree
     host_tree = recon_input.host_tree
     tip_mapping = recon_input.phi
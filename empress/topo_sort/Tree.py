@@ -1,9 +1,11 @@
 # Tree.py
 # Defines classes related to host and parasite nodes and trees
 
-from enum import Enum
+from enum import IntEnum
 
-class TreeType(Enum):
+# TreeType is part of the (name, type) node tuples used as dictionary keys in recon_builder.py.
+# An IntEnum hashes like its integer value, which is cheaper than the name-based hash of Enum
+class TreeType(IntEnum):
     HOST = 1
     PARASITE = 2
 
@@ -30,6 +32,9 @@ class Node:
         return str(self.name)
     
 class NodeLayout:
+    # a layout is created for every node, so __slots__ keeps them small
+    __slots__ = ("row", "col", "x", "y")
+
     def __init__(self):
         self.row = None         # float: logical position of this Node in rendering
 
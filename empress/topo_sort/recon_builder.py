@@ -3,7 +3,8 @@
 # as specified in Recon.py using the host tree, parasite tree, and reconfiguration 
 # representation in the DTL.
 
-from empress.topo_sort.Tree import NodeLayout
+from itertools import chain
+
 from empress.topo_sort.Tree import TreeType
 from empress.topo_sort.tree_format_converter import dict_to_tree
 
@@ -26,80 +27,61 @@ def build_trees_with_temporal_order(host_tree, parasite_tree, reconciliation):
     """
     # find the temporal order for host nodes and parasite nodes
     temporal_graph = build_temporal_graph(host_tree, parasite_tree, reconciliation)
-    ordering_dict = topological_order(temporal_graph)
-
-    host_tree_object = dict_to_tree(host_tree, TreeType.HOST)
-    parasite_tree_object = dict_to_tree(parasite_tree, TreeType.PARASITE)
+    ordering_dict, max_order = topological_order(temporal_graph)
 
-    # if there is a valid temporal ordering, we populate the layout with the order corresponding to the node
+    # if there is a valid temporal ordering, we build the trees and populate the layout
+    # with the order corresponding to the node in the same pass
     if ordering_dict != None:
-        # calculate the temporal order for leaves, which all have the largest order
-        max_order = 1
-        for node in ordering_dict:
-            if max_order < ordering_dict[node]:
-                max_order = ordering_dict[node]
-        leaf_order = max_order + 1
-        populate_nodes_with_order(host_tree_object.root_node, TreeType.HOST, ordering_dict, leaf_order)
-        populate_nodes_with_order(parasite_tree_object.root_node, TreeType.PARASITE, ordering_dict, leaf_order)
+        # calculate the temporal order for leaves, which all have the largest order.
+        # Orders start at 1, so leaves come no earlier than 2 even without internal nodes
+        leaf_order = max(max_order, 1) + 1
+        order = (ordering_dict, leaf_order)
+        host_tree_object = dict_to_tree(host_tree, TreeType.HOST, order)
+        parasite_tree_object = dict_to_tree(parasite_tree, TreeType.PARASITE, order)
         return host_tree_object, parasite_tree_object, True
     else:
         return None, None, False
 
-def create_parent_dict(host_tree, parasite_tree):
+def create_parent_dict(host_arrays, parasite_arrays):
     """
-    :param host_tree:  host tree dictionary
-    :param parasite_tree:  parasite tree dictionary
+    :param host_arrays:  host tree arrays as returned by _tree_to_arrays
+    :param parasite_arrays:  parasite tree arrays as returned by _tree_to_arrays
     :return: A dictionary that maps the name of a child node to the name of its parent
              for both the host tree and the parasite tree.
     """
-    parent_dict = {}
-    for edge_name in host_tree:
-        child_node = _bottom_node(host_tree[edge_name])
-        parent_node = _top_node(host_tree[edge_name])
-        parent_dict[child_node] = parent_node
-    for edge_name in parasite_tree:
-        child_node = _bottom_node(parasite_tree[edge_name])
-        parent_node = _top_node(parasite_tree[edge_name])
-        parent_dict[child_node] = parent_node
-    return parent_dict
+    host_tops, host_bottoms = host_arrays[0], host_arrays[1]
+    parasite_tops, parasite_bottoms = parasite_arrays[0], parasite_arrays[1]
+    return dict(zip(chain(host_bottoms, parasite_bottoms), chain(host_tops, parasite_tops)))
 
-def build_formatted_tree(tree):
+def _build_formatted_trees(host_arrays, parasite_arrays):
     """
-    :param tree:  a tree dictionary
+    :param host_arrays:  host tree arrays as returned by _tree_to_arrays
+    :param parasite_arrays:  parasite tree arrays as returned by _tree_to_arrays
     :return: A temporal graph that contains all the temporal relations implied by
-             the tree. Each key is a node tuple of the form (name, type) where name
-             is a string representing the name of a parasite or host tree INTERNAL 
-             node and type is either TreeType.HOST or TreeType.PARASITE which are 
-             defined in Recon.py. The associated value is a list of node tuples that
-             are the children of this node tuple in the tree.
-    """
-    tree_type = None
-    if 'pTop' in tree:
-        tree_type = TreeType.PARASITE
-    else:
-        tree_type = TreeType.HOST
-
-    formatted_tree = {}
-    for edge_name in tree:
-        edge_four_tuple = tree[edge_name]
-        # the temporal graph does not contain leaves as keys
-        if _is_leaf_edge(edge_four_tuple):
-            continue
-        # the temporal graph contains internal node tuples as keys,
-        # and their children nodes tuples as values
-        node_name = _bottom_node(edge_four_tuple)
-        left_child_name = edge_four_tuple[2][1]
-        right_child_name = edge_four_tuple[3][1]
-        formatted_tree[(node_name, tree_type)] = [(left_child_name, tree_type), \
-                                               (right_child_name, tree_type)]
-    return formatted_tree
-
-def uniquify(elements):
-    """
-    :param elements:  a list whose elements might not be unique
-    :return: A list that contains only the unique elements of the input list. 
-    """
-    return list(set(elements))
+             the host tree and the parasite tree. Each key is a node tuple of the form
+             (name, type) where name is a string representing the name of a parasite or
+             host tree INTERNAL node and type is either TreeType.HOST or TreeType.PARASITE
+             which are defined in Recon.py. The associated value is a set of node tuples
+             that are the children of this node tuple in its tree.
+    :return: A dictionary that maps the name of each host node to its node tuple
+    :return: A dictionary that maps the name of each parasite node to its node tuple
+    """
+    formatted_trees = {}
+    node_tuples_by_type = []
+    for tree_arrays, tree_type in ((host_arrays, TreeType.HOST), (parasite_arrays, TreeType.PARASITE)):
+        _, bottoms, left_children, right_children, is_leaf = tree_arrays
+        # create the node tuples once so they are shared across the whole temporal graph
+        node_tuples = {node_name: (node_name, tree_type) for node_name in bottoms}
+        # the temporal graph contains internal node tuples as keys, and their
+        # children nodes tuples as values; it does not contain leaves as keys
+        for node_name, left_child_name, right_child_name, leaf in \
+                zip(bottoms, left_children, right_children, is_leaf):
+            if not leaf:
+                formatted_trees[node_tuples[node_name]] = {node_tuples[left_child_name],
+                                                           node_tuples[right_child_name]}
+        node_tuples_by_type.append(node_tuples)
+    h_key, p_key = node_tuples_by_type
+    return formatted_trees, h_key, p_key
 
 def build_temporal_graph(host_tree, parasite_tree, reconciliation):
     """
@@ -111,135 +93,108 @@ def build_temporal_graph(host_tree, parasite_tree, reconciliation):
         the name of a parasite or host tree INTERNAL node and type is either TreeType.HOST or 
         TreeType.PARASITE which are defined in Recon.py. 
         Note that leaves of the host and parasite trees are not considered here.
-        The associated value is a list of node tuples that are the children of this node tuple
+        The associated value is a set of node tuples that are the children of this node tuple
         in the temporal graph.
     """
     # create a dictionary that maps each host and parasite node to its parent
-    parent = create_parent_dict(host_tree, parasite_tree)
-    # create temporal graphs for the host and parasite tree
-    temporal_host_tree = build_formatted_tree(host_tree)
-    temporal_parasite_tree = build_formatted_tree(parasite_tree)
-    # initialize the final temporal graph to the combined temporal graphs of host and parasite tree
-    temporal_graph = temporal_host_tree
-    temporal_graph.update(temporal_parasite_tree)
-    # add temporal relations implied by each node mapping and the corresponding event
-    for node_mapping in reconciliation:
-        parasite, host = node_mapping
-        host_parent = parent[host]
+    host_arrays = _tree_to_arrays(host_tree)
+    parasite_arrays = _tree_to_arrays(parasite_tree)
+    parent = create_parent_dict(host_arrays, parasite_arrays)
+    # initialize the final temporal graph to the combined temporal graphs of host and parasite tree,
+    # and get the node tuples of every host and parasite node by name
+    temporal_graph, h_key, p_key = _build_formatted_trees(host_arrays, parasite_arrays)
+    # group the node mappings by the kind of event, so that each group below adds
+    # its temporal relations without dispatching on the event type
+    leaf_mappings = []
+    transfer_mappings = []
+    other_mappings = []
+    for node_mapping, events in reconciliation.items():
         # get the event corresponding to this node mapping
-        event_tuple = reconciliation[node_mapping][0]
+        event_tuple = events[0]
         event_type = event_tuple[0]
+        if event_type == 'C':
+            leaf_mappings.append(node_mapping)
+        elif event_type == 'T':
+            transfer_mappings.append((node_mapping, event_tuple))
         # if event type is a loss, the parasite is not actually mapped to the host in final 
         # reconciliation, so we skip the node_mapping
-        if event_type == 'L':
-            continue
-        # if the node_mapping is not a leaf_mapping, we add the first relation
-        if event_type != 'C':
-            temporal_graph[(parasite, TreeType.PARASITE)].append((host, TreeType.HOST))
-        # if the node_mapping is not a mapping onto the root of host tree, we add the second relation
+        elif event_type != 'L':
+            other_mappings.append(node_mapping)
+
+    # a leaf mapping only implies that the parent of the host comes before the parasite
+    for parasite, host in leaf_mappings:
+        host_parent = parent[host]
+        # if the node_mapping is not a mapping onto the root of host tree, we add the relation
         if host_parent != 'Top':
-            temporal_graph[(host_parent, TreeType.HOST)].append((parasite, TreeType.PARASITE))
-        
-        # if event is a transfer, then we add two more temporal relations
-        if event_type == 'T':
-            # get the mapping for the right child which is the transferred child
-            right_child_mapping = event_tuple[2]
-            right_child_parasite, right_child_host = right_child_mapping
-            # since a transfer event is horizontal, we have these two implied relations
-            temporal_graph[(parent[right_child_host], TreeType.HOST)].append((parasite, TreeType.PARASITE))
-            # the second relation is only added if the right child mapping is not a leaf mapping
-            if right_child_mapping not in reconciliation or reconciliation[right_child_mapping][0][0]!='C':
-                temporal_graph[(right_child_parasite, TreeType.PARASITE)].append((host, TreeType.HOST))
+            temporal_graph[h_key[host_parent]].add(p_key[parasite])
 
-    for node_tuple in temporal_graph:
-        # we need to make sure the associated value in the dictionary does not contain repeated node tuples
-        temporal_graph[node_tuple] = uniquify(temporal_graph[node_tuple])
+    # other mappings also imply that the parasite comes before the host
+    for parasite, host in other_mappings:
+        parasite_tuple = p_key[parasite]
+        host_parent = parent[host]
+        temporal_graph[parasite_tuple].add(h_key[host])
+        if host_parent != 'Top':
+            temporal_graph[h_key[host_parent]].add(parasite_tuple)
+
+    # a transfer adds two more temporal relations on top of those of the other mappings
+    for (parasite, host), event_tuple in transfer_mappings:
+        parasite_tuple = p_key[parasite]
+        host_tuple = h_key[host]
+        host_parent = parent[host]
+        temporal_graph[parasite_tuple].add(host_tuple)
+        if host_parent != 'Top':
+            temporal_graph[h_key[host_parent]].add(parasite_tuple)
+        # get the mapping for the right child which is the transferred child
+        right_child_mapping = event_tuple[2]
+        right_child_parasite, right_child_host = right_child_mapping
+        right_child_host_parent = parent[right_child_host]
+        right_child_events = reconciliation.get(right_child_mapping)
+        # since a transfer event is horizontal, we have these two implied relations
+        temporal_graph[h_key[right_child_host_parent]].add(parasite_tuple)
+        # the second relation is only added if the right child mapping is not a leaf mapping
+        if right_child_events is None or right_child_events[0][0] != 'C':
+            temporal_graph[p_key[right_child_parasite]].add(host_tuple)
     return temporal_graph
     
-# This is a topological sort based on depth-first-search 
-# https://en.wikipedia.org/wiki/Topological_sorting#Depth-first_search
+# This is a topological sort based on Kahn's algorithm
+# https://en.wikipedia.org/wiki/Topological_sorting#Kahn's_algorithm
 def topological_order(temporal_graph):
     """
     :param temporal graph: as described in the return type of build_temporal_graph
     :return: A dictionary in which a key is a node tuple (name, type) as described
         in build_temporal_graph and the value is a positive integer representing its topological ordering.
         The ordering numbers are consecutive values beginning at 1.
+    :return: The largest ordering number, which is the number of ordered node tuples.
         If the graph has a cycle and the topological ordering therefore fails, this
-        function returns None.
-    """
-    # the ordering of nodes starts at 1
-    next_order = 1
-    unvisited_nodes = set(temporal_graph.keys())
-    # the visitng_nodes is used to detect cycles. If the visiting_nodes add an element that is already
-    # in the list, then we have found a cycle
-    visiting_nodes = set()
-    ordering_dict = {}
-    while unvisited_nodes:
-        start_node = unvisited_nodes.pop()
-        has_cycle, next_order = topological_order_helper(start_node, next_order, visiting_nodes,
-                               unvisited_nodes, temporal_graph, ordering_dict)
-        if has_cycle: return None
-    # reverse the ordering of the nodes
-    for node_tuple in ordering_dict:
-        ordering_dict[node_tuple] = next_order - ordering_dict[node_tuple]
-    return ordering_dict 
-           
-def topological_order_helper(start_node, start_order, visiting_nodes, unvisited_nodes, temporal_graph, ordering_dict):
-    """
-    :param start_node: is the starting node to explore the temporal_graph
-    :param start_order: is the order we start to label the nodes with
-    :param visiting_nodes: are nodes that are on the same path and are currently being explored
-    :param unvisited_nodes: are nodes in temporal graph that have not been visited
-    :param temporal graph: as described in the return type of build_temporal_graph
-    :param ordering_dict: is the dictionary that contains labeled node tuples and their ordering as described
-            in topological_order
-    :return: a Boolean value that denotes whether the part of temporal graph reachable from start_node
-             contains a cycle
-    :return: the start order to be used by the remaing nodes of temporal graph that have not been labeled
-    """
-    next_order = start_order
-    is_leaf = start_node not in temporal_graph
-    if is_leaf:
-        return False, next_order
-    else:
-        has_cycle = start_node in visiting_nodes
-        if has_cycle:
-            return True, next_order
-        visiting_nodes.add(start_node)
-        child_nodes = temporal_graph[start_node]
-        for child_node in child_nodes:
-            # if the child_node is already labeled, we skip it
-            if child_node in ordering_dict:
-                continue
-            if child_node in unvisited_nodes:
-                unvisited_nodes.remove(child_node)
-            has_cycle_child, next_order = topological_order_helper(child_node, next_order,  visiting_nodes,
-                                   unvisited_nodes, temporal_graph, ordering_dict)
-            # if we find a cycle, we stop the process
-            if has_cycle_child: return True, next_order
-        # if children are all labeled, we can label the start_node
-        visiting_nodes.remove(start_node)
-        ordering_dict[start_node] = next_order
-        return False, next_order + 1
-
-def populate_nodes_with_order(tree_node, tree_type, ordering_dict, leaf_order):
-    """
-    :param tree_node: the root node of the subtree we want to populate the temporal order information
-    :param tree_type: the type of the tree
-    :param ordering_dict: a dictionary that maps node tuples to their temporal order as described in topological_order
-    :param leaf_order: the temporal order we should assign to the leaves of the tree
-    """
-    layout = NodeLayout()
-    if tree_node.is_leaf:
-        layout.col = leaf_order
-        tree_node.layout = layout
-    else:
-        node_tuple = (tree_node.name, tree_type)
-        layout.col = ordering_dict[node_tuple]
-        tree_node.layout = layout
-        populate_nodes_with_order(tree_node.left_node, tree_type, ordering_dict, leaf_order)
-        populate_nodes_with_order(tree_node.right_node, tree_type, ordering_dict, leaf_order)
-
+        function returns None, None.
+    """
+    # number the node tuples so the sort itself works on integer indices instead of
+    # hashing node tuples. Leaves are not keys of the temporal graph, so they are
+    # dropped from the children lists and are not ordered
+    node_tuples = list(temporal_graph)
+    node_ids = {node_tuple: node_id for node_id, node_tuple in enumerate(node_tuples)}
+    children = [[node_ids[child_node] for child_node in child_nodes if child_node in node_ids]
+                for child_nodes in temporal_graph.values()]
+    # count the number of parents of each node
+    in_degree = [0] * len(children)
+    for child_ids in children:
+        for child_id in child_ids:
+            in_degree[child_id] += 1
+    # nodes without parents are ready to be labeled. The queue is a list that we keep
+    # appending to while iterating over it, so its final contents are the topological order
+    queue = [node_id for node_id, degree in enumerate(in_degree) if degree == 0]
+    for node_id in queue:
+        for child_id in children[node_id]:
+            in_degree[child_id] -= 1
+            # a child is ready once all of its parents are labeled
+            if in_degree[child_id] == 0:
+                queue.append(child_id)
+    # the nodes that were never labeled lie on a cycle
+    if len(queue) != len(node_tuples):
+        return None, None
+    # the ordering of nodes starts at 1, so the last order is the number of nodes
+    ordering_dict = {node_tuples[node_id]: order for order, node_id in enumerate(queue, 1)}
+    return ordering_dict, len(queue)
 
 # _get_names_of_internal_nodes(host_tree) will return [m0, m2]
 #  _get_names_of_internal_nodes(parasite_tree) will return [n0, n2]
@@ -249,31 +204,27 @@ def _get_names_of_internal_nodes(tree):
     :param: A host or parasite tree
     :return: A list of the names (strings) of the internal nodes in that tree
     """
-    node_names = list()
-    for edge_name in tree:
-        edge_four_tuple = tree[edge_name]
-        if not _is_leaf_edge(edge_four_tuple):
-            node_names.append(_bottom_node(edge_four_tuple))
-    return node_names
+    _, bottoms, _, _, is_leaf = _tree_to_arrays(tree)
+    return [node_name for node_name, leaf in zip(bottoms, is_leaf) if not leaf]
 
-def _top_node(edge_four_tuple):
-    """
-    :param: 4-tuple of the form (top_vertex_name, bottom_vertex_name, child_edge1, child_edge2)
-    :return: top_vertex_name
-    """
-    return edge_four_tuple[0]
-
-def _bottom_node(edge_four_tuple):
-    """
-    :param: 4-tuple of the form (top_vertex_name, bottom_vertex_name, child_edge1, child_edge2)
-    :return: bottom_vertex_name
+def _tree_to_arrays(tree):
     """
-    return edge_four_tuple[1]
-
-def _is_leaf_edge(edge_four_tuple):
-    """
-    :param: 4-tuple of the form (top_vertex_name, bottom_vertex_name, child_edge1, child_edge2)
-    :return: True if child_edge1 = child_edge2 = None.
-        This signifies that this edge terminates at a leaf. 
-    """
-    return edge_four_tuple[3] == None
+    :param: A host or parasite tree
+    :return: Five parallel lists with one entry per edge of the tree, in a single pass over the tree:
+        the top vertex names, the bottom vertex names, the names of the left and right children
+        of the bottom vertex (None for leaves), and whether the edge terminates at a leaf.
+    """
+    tops, bottoms, left_children, right_children, is_leaf = [], [], [], [], []
+    for top_name, bottom_name, left_edge, right_edge in tree.values():
+        tops.append(top_name)
+        bottoms.append(bottom_name)
+        # an edge terminates at a leaf if both child edges are None
+        if right_edge is None:
+            left_children.append(None)
+            right_children.append(None)
+            is_leaf.append(True)
+        else:
+            left_children.append(left_edge[1])
+            right_children.append(right_edge[1])
+            is_leaf.append(False)
+    return tops, bottoms, left_children, right_children, is_leaf
@@ -13,38 +13,52 @@ from empress.topo_sort import Tree  # Tree class
 # See TreeTester.py for an example of this format.
 
 
-def dict_to_tree(tree_dict, tree_type):
+def dict_to_tree(tree_dict, tree_type, order=None):
     """
     :param tree_dict: An edge-based representation of a tree as in the example above.
     :param tree_type: Tree.TreeType.{HOST, PARASITE} indicating the type of the tree.  This is used to 
         determine if the handle of the tree is "hTop" (host) or "pTop" (parasite)
+    :param order: An optional tuple (ordering_dict, leaf_order) where ordering_dict maps node tuples
+        (name, tree_type) of internal nodes to their temporal order and leaf_order is the temporal order
+        of the leaves (see recon_builder.py).  If given, the layout of each node is populated with its
+        temporal order while the tree is built.
     :return: A representation of the tree in Tree format (see Tree.py)
     """
 
     root = "hTop" if tree_type == Tree.TreeType.HOST else "pTop"
+    ordering_dict, leaf_order = order if order is not None else (None, None)
     output_tree = Tree.Tree()
     output_tree.tree_type = tree_type
-    output_tree.root_node = dict_to_tree_helper(tree_dict, root)
+    output_tree.root_node = dict_to_tree_helper(tree_dict, root, tree_type, ordering_dict, leaf_order)
     return output_tree
 
-def dict_to_tree_helper(tree_dict, root_edge):
+def dict_to_tree_helper(tree_dict, root_edge, tree_type=None, ordering_dict=None, leaf_order=None):
     """
     Helper function for dict_to_tree.
     """
 
-    root_name = tree_dict[root_edge][1]
-    new_node = Tree.Node(root_name)
-
-    left_edge = tree_dict[root_edge][2] 
-    right_edge = tree_dict[root_edge][3] 
-
-    if left_edge is None and right_edge is None:
-        return new_node
-    else:
-        new_left_node = dict_to_tree_helper(tree_dict, left_edge)
-        new_right_node = dict_to_tree_helper(tree_dict, right_edge)
-        new_node.left_node = new_left_node
-        new_left_node.parent_node = new_node
-        new_node.right_node = new_right_node
-        new_left_node.parent_node = new_node
-        return new_node
+    root_node = Tree.Node(tree_dict[root_edge][1])
+    # walk the tree with an explicit stack so deep trees do not hit the recursion limit
+    stack = [(root_edge, root_node)]
+    while stack:
+        edge, new_node = stack.pop()
+        left_edge = tree_dict[edge][2]
+        right_edge = tree_dict[edge][3]
+        is_leaf = left_edge is None and right_edge is None
+
+        if ordering_dict is not None:
+            layout = Tree.NodeLayout()
+            layout.col = leaf_order if is_leaf else ordering_dict[(new_node.name, tree_type)]
+            new_node.layout = layout
+
+        if not is_leaf:
+            new_left_node = Tree.Node(tree_dict[left_edge][1])
+            new_right_node = Tree.Node(tree_dict[right_edge][1])
+            new_node.left_node = new_left_node
+            new_left_node.parent_node = new_node
+            new_node.right_node = new_right_node
+            new_right_node.parent_node = new_node
+            # push the right child first so the left subtree is built first
+            stack.append((right_edge, new_right_node))
+            stack.append((left_edge, new_left_node))
+    return root_node
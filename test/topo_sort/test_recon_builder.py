@@ -47,15 +47,23 @@ class TestReconBuilder(unittest.TestCase):
         is temporally consistent
         """
         temporal_graph = recon_builder.build_temporal_graph(host_tree, parasite_tree, reconciliation)
-        ordering_dict = recon_builder.topological_order(temporal_graph)
+        ordering_dict, max_order = recon_builder.topological_order(temporal_graph)
         self.assertIsNotNone(ordering_dict)
         self.check_topological_order(temporal_graph, ordering_dict)
+        self.assertEqual(max_order, max(ordering_dict.values()))
 
         host, parasite, if_consistent = recon_builder.build_trees_with_temporal_order(host_tree,
                                                                     parasite_tree, reconciliation)
         self.assertIsNotNone(host)
         self.assertIsNotNone(parasite)
         self.assertTrue(if_consistent)
+        # the nodes are populated with their temporal order, and leaves come last
+        for tree in (host, parasite):
+            for node in tree.postorder_list():
+                if node.is_leaf:
+                    self.assertEqual(node.layout.col, max_order + 1)
+                else:
+                    self.assertEqual(node.layout.col, ordering_dict[(node.name, tree.tree_type)])
 
     def check_temporally_inconsistent(self, host_tree, parasite_tree, reconciliation):
         """
@@ -64,7 +72,7 @@ class TestReconBuilder(unittest.TestCase):
         function returns None, None, False
         """
         temporal_graph = recon_builder.build_temporal_graph(host_tree, parasite_tree, reconciliation)
-        ordering_dict = recon_builder.topological_order(temporal_graph)
+        ordering_dict, _ = recon_builder.topological_order(temporal_graph)
         self.assertIsNone(ordering_dict)
 
         host, parasite, if_consistent = recon_builder.build_trees_with_temporal_order(host_tree,
@@ -134,6 +142,46 @@ class TestReconBuilder(unittest.TestCase):
 
         self.check_temporally_consistent(host_tree, parasite_tree, reconciliation)
 
+    def test_leaf_order_without_internal_nodes(self):
+        """
+        Test build_trees_with_temporal_order when the host and parasite trees are single leaves
+        """
+        host_tree = {'hTop': ('Top', 'h0', None, None)}
+        parasite_tree = {'pTop': ('Top', 'p0', None, None)}
+        reconciliation = {('p0', 'h0'): [('C', (None, None), (None, None))]}
+
+        host, parasite, if_consistent = recon_builder.build_trees_with_temporal_order(host_tree,
+                                                                    parasite_tree, reconciliation)
+        self.assertTrue(if_consistent)
+        self.assertEqual(host.root_node.layout.col, 2)
+        self.assertEqual(parasite.root_node.layout.col, 2)
+
+    def test_deep_host_tree(self):
+        """
+        Test build_trees_with_temporal_order on a host tree that is deeper than the recursion limit
+        """
+        depth = 5000
+        # a caterpillar tree where each internal node m<i> has a leaf l<i> and the next node as children
+        host_tree = {'hTop': ('Top', 'm0', ('m0', 'l0'), ('m0', 'm1'))}
+        for i in range(depth):
+            host_tree[('m%d' % i, 'l%d' % i)] = ('m%d' % i, 'l%d' % i, None, None)
+            if i + 1 < depth:
+                host_tree[('m%d' % i, 'm%d' % (i + 1))] = ('m%d' % i, 'm%d' % (i + 1),
+                                                           ('m%d' % (i + 1), 'l%d' % (i + 1)),
+                                                           ('m%d' % (i + 1), 'm%d' % (i + 2)))
+        host_tree[('m%d' % (depth - 1), 'm%d' % depth)] = ('m%d' % (depth - 1), 'm%d' % depth, None, None)
+        parasite_tree = {'pTop': ('Top', 'p0', None, None)}
+        reconciliation = {('p0', 'l0'): [('C', (None, None), (None, None))]}
+
+        host, _, if_consistent = recon_builder.build_trees_with_temporal_order(host_tree,
+                                                                    parasite_tree, reconciliation)
+        self.assertTrue(if_consistent)
+        node = host.root_node
+        while not node.is_leaf:
+            self.assertLess(node.layout.col, node.right_node.layout.col)
+            node = node.right_node
+        self.assertEqual(node.layout.col, depth + 1)
+
     def test_detect_inconsistency_1(self):
         """
         Test build_trees_with_temporal_order on a temporally inconsistent reconciliation
@@ -214,12 +262,27 @@ class TestReconBuilder(unittest.TestCase):
                     recon_graph, _, _, best_roots = DTLReconGraph.DP(recon_input, d, t, l)
                     for reconciliation, _ in HistogramAlgTools.BF_enumerate_MPRs(recon_graph, best_roots):
                         temporal_graph = recon_builder.build_temporal_graph(host_tree, parasite_tree, reconciliation)
-                        ordering_dict = recon_builder.topological_order(temporal_graph)
+                        ordering_dict, _ = recon_builder.topological_order(temporal_graph)
                         # if there is no temporal inconsistency
                         if ordering_dict != None:
                             self.check_topological_order(temporal_graph, ordering_dict)
                 count += 1
 
+    def test_topological_order_deep_graph(self):
+        """
+        Test topological_order on a chain that is deeper than the recursion limit
+        """
+        depth = 5000
+        temporal_graph = {('n%d' % i, i % 2): [('n%d' % (i + 1), (i + 1) % 2)] for i in range(depth)}
+        ordering_dict, max_order = recon_builder.topological_order(temporal_graph)
+        self.assertIsNotNone(ordering_dict)
+        self.check_topological_order(temporal_graph, ordering_dict)
+        self.assertEqual(max_order, max(ordering_dict.values()))
+
+        # closing the chain into a loop makes the ordering fail
+        temporal_graph[('n%d' % (depth - 1), (depth - 1) % 2)].append(('n0', 0))
+        self.assertEqual(recon_builder.topological_order(temporal_graph), (None, None))
+
     def tearDown(self):
         """
         Clean up the generated tests